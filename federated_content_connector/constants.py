@@ -4,3 +4,15 @@ EXEC_ED_LANDING_PAGE = 'https://www.getsmarter.com/account'
 EXEC_ED_COURSE_TYPE = 'executive-education-2u'
 BOOTCAMP_2U = 'bootcamp-2u'
 PRODUCT_SOURCE_2U = '2u'
+
+# maximum number of courseruns fetched from discovery in a single api call
+DEFAULT_CHUNK_SIZE = 250
+
+# number of courserun chunks fetched from discovery concurrently
+DEFAULT_MAX_WORKERS = 4
+
+# number of seconds discovery api responses are cached for during full imports
+DEFAULT_API_CACHE_TIMEOUT = 600
+
+# discovery api responses larger than this number of bytes are not cached, memcached rejects items over 1 MB
+DEFAULT_API_CACHE_MAX_SIZE = 900 * 1024
@@ -1,16 +1,34 @@
 """Course metadata importer."""
 
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from urllib.parse import quote_plus, urlencode, urljoin
 
 import backoff
+import orjson
 from common.djangoapps.course_modes.models import CourseMode
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import IntegrityError, connections, transaction
+from django.utils.timezone import now
+from edx_django_utils.cache import get_cache_key
 from openedx.core.djangoapps.catalog.models import CatalogIntegration
 from openedx.core.djangoapps.catalog.utils import get_catalog_api_base_url, get_catalog_api_client
 from openedx.core.djangoapps.content.course_overviews.models import CourseOverview
-
-from federated_content_connector.constants import BOOTCAMP_2U, EXEC_ED_COURSE_TYPE
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+from federated_content_connector.constants import (
+    BOOTCAMP_2U,
+    DEFAULT_API_CACHE_MAX_SIZE,
+    DEFAULT_API_CACHE_TIMEOUT,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_WORKERS,
+    EXEC_ED_COURSE_TYPE,
+)
 from federated_content_connector.models import CourseDetails
 
 BEST_MODE_ORDER = [
@@ -20,43 +38,100 @@ BEST_MODE_ORDER = [
     CourseMode.UNPAID_EXECUTIVE_EDUCATION,
     CourseMode.AUDIT,
 ]
+BEST_MODE_RANK = {mode: rank for rank, mode in enumerate(BEST_MODE_ORDER)}
+BEST_MODES = frozenset(BEST_MODE_ORDER)
+
+COURSE_DETAILS_FIELDS = ['course_type', 'product_source', 'enroll_by', 'start_date', 'end_date', 'modified']
+# only request the fields of discovery api responses that are used during import
+COURSES_API_FIELDS = 'key,uuid,course_type,product_source,additional_metadata,course_runs'
+COURSE_RUNS_API_FIELDS = 'key,course_uuid'
+
+LOCATORS_ITERATOR_CHUNK_SIZE = 2000
+# keep discovery urls well below the common 8 KB request line limit
+MAX_QUERY_PARAM_LENGTH = 7000
+COURSE_UUID_LENGTH = 36
+STORE_BATCH_SIZE = 500
 
 logger = logging.getLogger(__name__)
 User = get_user_model()
 
 
+@lru_cache(maxsize=100000)
+def quote_key(key):
+    """
+    Return url encoded course or courserun `key`, memoized as the same keys are encoded on every import.
+    """
+    return quote_plus(key)
+
+
+def is_permanent_api_error(exception):
+    """
+    Return True if the failed api call will not succeed on retry, i.e. it failed with a 4xx other than 429.
+    """
+    response = getattr(exception, 'response', None)
+    if response is None:
+        return False
+
+    return response.status_code < 500 and response.status_code != 429
+
+
 class CourseMetadataImporter:
     """
     Import course metadata from discovery.
     """
 
     @classmethod
-    def get_api_client(cls):
+    def get_service_user(cls):
         """
-        Return discovery api client.
+        Return the catalog integration service user.
         """
         catalog_integration = CatalogIntegration.current()
         username = catalog_integration.service_username
 
         try:
-            user = User.objects.get(username=username)
+            return User.objects.get(username=username)
         except User.DoesNotExist:
             logger.exception(
-                f'Failed to create API client. Service user {username} does not exist.'
+                'Failed to create API client. Service user %s does not exist.', username
             )
             raise
 
-        return get_catalog_api_client(user)
+    @classmethod
+    def get_api_client(cls, user=None, api_base_url=None):
+        """
+        Return discovery api client for `user`, the catalog integration service user by default.
+        """
+        if user is None:
+            user = cls.get_service_user()
+        if api_base_url is None:
+            api_base_url = get_catalog_api_base_url()
+
+        client = get_catalog_api_client(user)
+        # share a single connection pool between all clients so that connections to discovery are kept alive
+        client.mount(api_base_url, cls.get_http_adapter())
+        return client
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def get_http_adapter():
+        """
+        Return the http adapter shared by all discovery api clients.
+        """
+        pool_size = getattr(settings, 'FEDERATED_CONTENT_CONNECTOR_MAX_WORKERS', DEFAULT_MAX_WORKERS)
+        return HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
 
     @classmethod
-    def import_all_courses_metadata(cls):
+    def import_all_courses_metadata(cls, use_cache=False):
         """
         Import course metadata for all courses.
+
+        Args:
+            use_cache (bool): whether cached discovery responses can be used
         """
         logger.info('[COURSE_METADATA_IMPORTER] Course metadata import started for all courses.')
 
         all_active_courserun_locators = cls.courserun_locators_to_import()
-        cls.import_courses_metadata(all_active_courserun_locators)
+        cls.import_courses_metadata(all_active_courserun_locators, use_cache=use_cache)
 
         logger.info('[COURSE_METADATA_IMPORTER] Course metadata import completed for all courses.')
 
@@ -68,87 +143,189 @@ class CourseMetadataImporter:
         Args:
             courserun_locators (list): list of courserun locator objects
         """
-        logger.info(f'[COURSE_METADATA_IMPORTER] Course metadata import started for courses. {courserun_locators}')
+        logger.info('[COURSE_METADATA_IMPORTER] Course metadata import started for courses. %s', courserun_locators)
 
         cls.import_courses_metadata(courserun_locators)
 
-        logger.info(f'[COURSE_METADATA_IMPORTER] Course metadata import completed for courses. {courserun_locators}')
+        logger.info('[COURSE_METADATA_IMPORTER] Course metadata import completed for courses. %s', courserun_locators)
 
     @classmethod
-    def import_courses_metadata(cls, courserun_locators):
+    def import_courses_metadata(cls, courserun_locators, use_cache=False):
         """
         Import course metadata for given course locators.
 
         Args:
             courserun_locators (list): list of courserun locator objects
+            use_cache (bool): whether cached discovery responses can be used
         """
         logger.info('[COURSE_METADATA_IMPORTER] Course metadata import started.')
 
-        for courserun_locators_chunk in cls.chunks(courserun_locators):
-
-            # convert course locator objects to courserun keys
-            courserun_keys = list(map(str, courserun_locators_chunk))
+        api_base_url = get_catalog_api_base_url()
+        # resolve the service user once, so that worker threads do not need to look it up for every api call
+        user = cls.get_service_user()
+        max_workers = getattr(settings, 'FEDERATED_CONTENT_CONNECTOR_MAX_WORKERS', DEFAULT_MAX_WORKERS)
+        courserun_locators_chunks = cls.courserun_locators_chunks(courserun_locators)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # fetch up to `max_workers` chunks from discovery concurrently, then process and store them in order
+            for chunks_batch in cls.chunks(courserun_locators_chunks, max_workers):
+                # convert course locator objects to courserun keys
+                courserun_keys_batch = [list(map(str, chunk)) for chunk in chunks_batch]
+                fetched_chunks = executor.map(
+                    lambda chunk, courserun_keys: cls.fetch_courses_details_concurrently(
+                        chunk, api_base_url, use_cache, courserun_keys, user
+                    ),
+                    chunks_batch,
+                    courserun_keys_batch,
+                )
+                for courserun_keys, (course_details, courserun_with_course_keys) in zip(
+                    courserun_keys_batch, fetched_chunks
+                ):
+                    logger.info('[COURSE_METADATA_IMPORTER] Importing metadata. Chunk size: %s', len(courserun_keys))
+                    logger.debug('[COURSE_METADATA_IMPORTER] Importing metadata. Courses: %s', courserun_keys)
+
+                    processed_courses_details = cls.process_courses_details(
+                        course_details,
+                        courserun_with_course_keys
+                    )
+                    cls.store_courses_details(processed_courses_details)
 
-            logger.info(f'[COURSE_METADATA_IMPORTER] Importing metadata. Courses: {courserun_keys}')
+                    logger.info('[COURSE_METADATA_IMPORTER] Import completed. Chunk size: %s', len(courserun_keys))
+                    logger.debug('[COURSE_METADATA_IMPORTER] Import completed. Courses: %s', courserun_keys)
 
-            course_details, courserun_with_course_uuids = cls.fetch_courses_details(
-                courserun_locators_chunk,
-                get_catalog_api_base_url()
-            )
-            processed_courses_details = cls.process_courses_details(course_details, courserun_with_course_uuids)
-            cls.store_courses_details(processed_courses_details)
+        logger.info('[COURSE_METADATA_IMPORTER] Course metadata import completed for all courses.')
 
-            logger.info(f'[COURSE_METADATA_IMPORTER] Import completed. Courses: {courserun_keys}')
+    @classmethod
+    def fetch_courses_details_concurrently(cls, courserun_locators, api_base_url, use_cache=False, courserun_keys=None,
+                                           user=None):
+        """
+        Fetch the course data from discovery from a worker thread.
 
-        logger.info('[COURSE_METADATA_IMPORTER] Course metadata import completed for all courses.')
+        Creating the api client can query the database, so database connections opened by the worker thread are
+        closed once the data is fetched.
+        """
+        try:
+            return cls.fetch_courses_details(courserun_locators, api_base_url, use_cache, courserun_keys, user)
+        finally:
+            connections.close_all()
 
     @classmethod
     def courserun_locators_to_import(cls):
         """
-        Construct list of all course locators for which we want to import data.
+        Return an iterator over all course locators for which we want to import data.
         """
-        return list(CourseOverview.objects.all().values_list('id', flat=True))
+        courserun_locators = CourseOverview.objects.all().values_list('id', flat=True)
+        return courserun_locators.iterator(chunk_size=LOCATORS_ITERATOR_CHUNK_SIZE)
 
     @classmethod
-    def fetch_courses_details(cls, courserun_locators, api_base_url):
+    def fetch_courses_details(cls, courserun_locators, api_base_url, use_cache=False, courserun_keys=None, user=None):
         """
         Fetch the course data from discovery using `/api/v1/courses` endpoint.
+
+        Courses are requested by the course keys derived from the courserun locators.
+
+        Returns:
+            (list of course metadata, map of courserun key and course key)
+        """
+        if courserun_keys is None:
+            courserun_keys = list(map(str, courserun_locators))
+
+        courserun_with_course_keys = {
+            courserun_key: cls.construct_course_key(courserun_locator)
+            for courserun_key, courserun_locator in zip(courserun_keys, courserun_locators)
+        }
+        course_keys = list(dict.fromkeys(courserun_with_course_keys.values()))
+        encoded_course_keys = ','.join(map(quote_key, course_keys))
+
+        logger.debug('[COURSE_METADATA_IMPORTER] Fetching details from discovery. Course Keys %s.', course_keys)
+        api_url = urljoin(
+            f"{api_base_url}/",
+            f"courses/?limit={cls.chunk_size()}&include_hidden_course_runs=1&fields={COURSES_API_FIELDS}"
+            f"&keys={encoded_course_keys}"
+        )
+        results = cls.get_all_results(api_url, use_cache, user, api_base_url)
+
+        courserun_keys_by_course_key = {
+            course['key']: {course_run['key'] for course_run in course.get('course_runs') or []}
+            for course in results
+        }
+        # a courserun can belong to a course whose key differs from the one in the courserun key, in which case
+        # the derived course key matches no course or a course that does not contain the courserun
+        missing_courserun_keys = [
+            courserun_key for courserun_key, course_key in courserun_with_course_keys.items()
+            if courserun_key not in courserun_keys_by_course_key.get(course_key, ())
+        ]
+        if missing_courserun_keys:
+            for courserun_key in missing_courserun_keys:
+                del courserun_with_course_keys[courserun_key]
+
+            fallback_results, fallback_courserun_with_course_keys = cls.fetch_courses_details_by_uuids(
+                api_base_url, missing_courserun_keys, use_cache, user
+            )
+            results.extend(fallback_results)
+            courserun_with_course_keys.update(fallback_courserun_with_course_keys)
+
+            not_found_courserun_keys = set(missing_courserun_keys) - set(fallback_courserun_with_course_keys)
+            if not_found_courserun_keys:
+                logger.info(
+                    '[COURSE_METADATA_IMPORTER] Courseruns not found in discovery. Courseruns: %s',
+                    not_found_courserun_keys,
+                )
+
+        return results, courserun_with_course_keys
+
+    @classmethod
+    def fetch_courses_details_by_uuids(cls, api_base_url, courserun_keys, use_cache=False, user=None):
         """
-        courserun_with_course_uuids = cls.fetch_course_uuids(api_base_url, courserun_locators)
-        course_uuids = courserun_with_course_uuids.values()
+        Fetch the course data from discovery using the course uuids of the courseruns.
+
+        Returns:
+            (list of course metadata, map of courserun key and course key)
+        """
+        courserun_with_course_uuids = cls.fetch_course_uuids(api_base_url, courserun_keys, use_cache, user)
+        if not courserun_with_course_uuids:
+            return [], {}
+
+        course_uuids = list(dict.fromkeys(courserun_with_course_uuids.values()))
         course_uuids_str = ','.join(course_uuids)
 
-        logger.info(f'[COURSE_METADATA_IMPORTER] Fetching details from discovery. Course UUIDs {course_uuids}.')
+        logger.debug('[COURSE_METADATA_IMPORTER] Fetching details from discovery. Course UUIDs %s.', course_uuids)
         api_url = urljoin(
-            f"{api_base_url}/", f"courses/?limit=50&include_hidden_course_runs=1&uuids={course_uuids_str}"
+            f"{api_base_url}/",
+            f"courses/?limit={cls.chunk_size()}&include_hidden_course_runs=1&fields={COURSES_API_FIELDS}"
+            f"&uuids={course_uuids_str}"
         )
-        response = cls.get_response_from_api(api_url)
-        courses_details = response.json()
-        results = courses_details.get('results', [])
+        results = cls.get_all_results(api_url, use_cache, user, api_base_url)
 
-        return results, courserun_with_course_uuids
+        course_keys_by_uuid = {course['uuid']: course['key'] for course in results}
+        courserun_with_course_keys = {
+            courserun_key: course_keys_by_uuid.get(course_uuid)
+            for courserun_key, course_uuid in courserun_with_course_uuids.items()
+        }
+
+        return results, courserun_with_course_keys
 
     @classmethod
-    def fetch_course_uuids(cls, api_base_url, courserun_locators):
+    def fetch_course_uuids(cls, api_base_url, courserun_keys, use_cache=False, user=None):
         """
         Return a map of courserun key and course uuid.
         """
-        courserun_keys = list(map(str, courserun_locators))
-        encoded_courserun_keys = ','.join(map(quote_plus, courserun_keys))
+        courserun_keys_set = set(courserun_keys)
+        encoded_courserun_keys = ','.join(map(quote_key, courserun_keys))
 
-        logger.info(f'[COURSE_METADATA_IMPORTER] Fetching uuids for Courseruns {encoded_courserun_keys}')
+        logger.debug('[COURSE_METADATA_IMPORTER] Fetching uuids for Courseruns %s', encoded_courserun_keys)
         api_url = urljoin(
-            f"{api_base_url}/", f"course_runs/?limit=50&include_hidden_course_runs=1&keys={encoded_courserun_keys}"
+            f"{api_base_url}/",
+            f"course_runs/?limit={cls.chunk_size()}&include_hidden_course_runs=1&fields={COURSE_RUNS_API_FIELDS}"
+            f"&keys={encoded_courserun_keys}"
         )
-        response = cls.get_response_from_api(api_url)
-        courses_details = response.json()
-        results = courses_details.get('results', [])
+        results = cls.get_all_results(api_url, use_cache, user, api_base_url)
 
         courserun_with_course_uuids = {}
         for result in results:
             courserun_key = result.get('key')
 
-            if courserun_key not in courserun_keys:
+            if courserun_key not in courserun_keys_set:
                 continue
 
             courserun_with_course_uuids[courserun_key] = result.get('course_uuid')
@@ -160,59 +337,121 @@ class CourseMetadataImporter:
         """Fetch courses updated since `timestamp`."""
         query_params = {
             'timestamp': timestamp,
-            'limit': 50,
+            'limit': cls.chunk_size(),
             'include_hidden_course_runs': 1,
+            'fields': f'{COURSES_API_FIELDS},data_modified_timestamp',
         }
 
         api_base_url = get_catalog_api_base_url()
         params = urlencode(query_params)
         api_url = urljoin(f"{api_base_url}/", f"courses/?{params}")
-        results, next_url, total = cls.get_api_reponse(api_url)
-        logger.info(f'[COURSE_METADATA_IMPORTER] Total Records are {total}')
+        results, next_url, total = cls.get_api_reponse(api_url, api_base_url=api_base_url)
+        logger.info('[COURSE_METADATA_IMPORTER] Total Records are %s', total)
         yield results
 
         while next_url:
-            results, next_url, __ = cls.get_api_reponse(next_url)
+            results, next_url, __ = cls.get_api_reponse(next_url, api_base_url=api_base_url)
             yield results
 
     @classmethod
-    def get_api_reponse(cls, api_url):
+    def get_api_reponse(cls, api_url, use_cache=False, user=None, api_base_url=None):
         """Get response from API."""
-        response = cls.get_response_from_api(api_url)
-        courses = response.json()
+        courses = cls.get_api_response_data(api_url, use_cache, user, api_base_url)
         results = courses.get('results', [])
         return results, courses.get('next'), courses.get('count')
 
+    @classmethod
+    def get_all_results(cls, api_url, use_cache=False, user=None, api_base_url=None):
+        """Get results from all pages of API response."""
+        results, next_url, __ = cls.get_api_reponse(api_url, use_cache, user, api_base_url)
+        while next_url:
+            logger.info('[COURSE_METADATA_IMPORTER] Fetching next page. URL: [%s]', next_url)
+            next_results, next_url, __ = cls.get_api_reponse(next_url, use_cache, user, api_base_url)
+            results.extend(next_results)
+
+        return results
+
+    @classmethod
+    def get_api_response_data(cls, api_url, use_cache=False, user=None, api_base_url=None):
+        """
+        Return the json data of api response.
+
+        If `use_cache` is set, the data is cached for `FEDERATED_CONTENT_CONNECTOR_API_CACHE_TIMEOUT` seconds.
+        Responses larger than `FEDERATED_CONTENT_CONNECTOR_API_CACHE_MAX_SIZE` bytes are not cached, as cache
+        backends like memcached do not store items over 1 MB.
+        """
+        if not use_cache:
+            return cls.response_json(cls.get_response_from_api(api_url, user, api_base_url))
+
+        cache_key = get_cache_key(resource='federated_content_connector.discovery_api_response', api_url=api_url)
+        data = cache.get(cache_key)
+        if data is None:
+            response = cls.get_response_from_api(api_url, user, api_base_url)
+            data = cls.response_json(response)
+            cache_max_size = getattr(
+                settings, 'FEDERATED_CONTENT_CONNECTOR_API_CACHE_MAX_SIZE', DEFAULT_API_CACHE_MAX_SIZE
+            )
+            if len(response.content) > cache_max_size:
+                logger.info(
+                    '[COURSE_METADATA_IMPORTER] API Response too large to cache. Size: %s, URL: [%s]',
+                    len(response.content),
+                    api_url,
+                )
+            else:
+                cache_timeout = getattr(
+                    settings, 'FEDERATED_CONTENT_CONNECTOR_API_CACHE_TIMEOUT', DEFAULT_API_CACHE_TIMEOUT
+                )
+                cache.set(cache_key, data, cache_timeout)
+        else:
+            logger.debug('[COURSE_METADATA_IMPORTER] API Response found in cache: URL: [%s]', api_url)
+
+        return data
+
+    @staticmethod
+    def response_json(response):
+        """
+        Return the decoded json body of api response, decoded with orjson as it is faster than `response.json()`.
+        """
+        return orjson.loads(response.content)
+
     @classmethod
     @backoff.on_exception(
         backoff.expo,
-        Exception,
+        RequestException,
         max_tries=3,
+        jitter=backoff.full_jitter,
+        giveup=is_permanent_api_error,
         logger=logger,
     )
-    def get_response_from_api(cls, api_url):
+    def get_response_from_api(cls, api_url, user=None, api_base_url=None):
         """
         Call api endpoint and return response.
         """
-        logger.info(f'[COURSE_METADATA_IMPORTER] API Call: URL: [{api_url}]')
-        client = cls.get_api_client()
+        # urls carry the keys of a whole chunk
+        logger.debug('[COURSE_METADATA_IMPORTER] API Call: URL: [%s]', api_url)
+        client = cls.get_api_client(user, api_base_url)
         response = client.get(api_url)
         response.raise_for_status()
         return response
 
     @classmethod
-    def process_courses_details(cls, courses_details, courserun_with_course_uuids):
+    def process_courses_details(cls, courses_details, courserun_with_course_keys):
         """
         Parse and extract the minimal data that we need.
+
+        Yields:
+            (courserun key, course metadata) pairs
         """
         log_prefix = 'COURSE_METADATA_IMPORTER'
 
-        courses = {}
-        for courserun_key, course_uuid in courserun_with_course_uuids.items():
-            logger.info(f'[{log_prefix}] Process. CourserunKey: {courserun_key}, CourseUUID: {course_uuid}')
-            course_metadata = cls.find_attr(courses_details, 'uuid', course_uuid)
+        courses_by_key = {course['key']: course for course in courses_details}
+        courseruns_by_course_key = {}
+
+        for courserun_key, course_key in courserun_with_course_keys.items():
+            logger.debug('[%s] Process. CourserunKey: %s, CourseKey: %s', log_prefix, courserun_key, course_key)
+            course_metadata = courses_by_key.get(course_key)
             if not course_metadata:
-                logger.info(f'[COURSE_METADATA_IMPORTER] Metadata not found. CourseUUID: {course_uuid}')
+                logger.info('[COURSE_METADATA_IMPORTER] Metadata not found. CourseKey: %s', course_key)
                 continue
 
             course_type = course_metadata.get('course_type') or ''
@@ -229,20 +468,25 @@ class CourseMetadataImporter:
                     start_date = additional_metadata.get('start_date')
                     end_date = additional_metadata.get('end_date')
             else:
-                course_run = cls.find_attr(course_metadata.get('course_runs'), 'key', courserun_key)
+                if course_key not in courseruns_by_course_key:
+                    courseruns_by_course_key[course_key] = {
+                        course_run['key']: course_run for course_run in course_metadata.get('course_runs') or []
+                    }
+                course_run = courseruns_by_course_key[course_key].get(courserun_key)
                 if course_run:
                     seat = cls.find_best_mode_seat(course_run.get('seats'))
                     if seat:
                         enroll_by = seat.get('upgrade_deadline')
                     else:
-                        logger.info(
-                            f"[{log_prefix}] No Seat Found. Seats: {course_run.get('seats')}"
-                        )
+                        logger.info('[%s] No Seat Found. Seats: %s', log_prefix, course_run.get('seats'))
                     start_date = course_run.get('start')
                     end_date = course_run.get('end')
                 else:
                     logger.info(
-                        f'[{log_prefix}] Courserun not found. CourserunKey: {courserun_key}, CourseUUID: {course_uuid}'
+                        '[%s] Courserun not found. CourserunKey: %s, CourseKey: %s',
+                        log_prefix,
+                        courserun_key,
+                        course_key,
                     )
                     continue
 
@@ -253,64 +497,109 @@ class CourseMetadataImporter:
                 'start_date': start_date,
                 'end_date': end_date,
             }
-            courses[courserun_key] = course_data
-
-        return courses
+            yield courserun_key, course_data
 
     @classmethod
+    @transaction.atomic
     def store_courses_details(cls, courses_details):
         """
         Store courses metadata in database.
+
+        Existing records are updated and new records are created in bulk, in batches of `STORE_BATCH_SIZE`,
+        so the number of queries does not grow with the number of courseruns. If a record is created by another
+        import after the existing records are looked up, the new records of that batch are stored one by one.
+
+        Args:
+            courses_details (iterable): (courserun key, course metadata) pairs
         """
-        for courserun_key, course_detail in courses_details.items():
-            CourseDetails.objects.update_or_create(
-                id=courserun_key,
-                defaults=course_detail
+        modified = now()
+        for courses_details_batch in cls.chunks(courses_details, STORE_BATCH_SIZE):
+            courserun_keys = [courserun_key for courserun_key, __ in courses_details_batch]
+            existing_ids = set(
+                map(str, CourseDetails.objects.filter(id__in=courserun_keys).values_list('id', flat=True))
             )
 
+            objs_to_create, objs_to_update = [], []
+            for courserun_key, course_detail in courses_details_batch:
+                course_details_obj = CourseDetails(id=courserun_key, **course_detail)
+                if courserun_key in existing_ids:
+                    course_details_obj.modified = modified
+                    objs_to_update.append(course_details_obj)
+                else:
+                    objs_to_create.append(course_details_obj)
+
+            try:
+                with transaction.atomic():
+                    CourseDetails.objects.bulk_create(objs_to_create)
+            except IntegrityError:
+                logger.info('[COURSE_METADATA_IMPORTER] Courseruns created during import. Storing them one by one.')
+                for courserun_key, course_detail in courses_details_batch:
+                    if courserun_key not in existing_ids:
+                        CourseDetails.objects.update_or_create(id=courserun_key, defaults=course_detail)
+            CourseDetails.objects.bulk_update(objs_to_update, COURSE_DETAILS_FIELDS)
+
     @classmethod
     def find_best_mode_seat(cls, seats):
         """
         Find the seat by best course mode.
+
+        Seats of modes that are not in `BEST_MODE_ORDER` are ignored.
         """
-        def sort_key(mode):
-            """
-            Assign a weight to the seat dictionary based on the position of its type in best moode order list.
-            """
-            mode_type = mode['type']
-            if mode_type in BEST_MODE_ORDER:
-                return len(BEST_MODE_ORDER) - BEST_MODE_ORDER.index(mode_type)
-            else:
-                return 0
+        candidate_seats = [seat for seat in seats or [] if seat.get('type') in BEST_MODES]
+        if not candidate_seats:
+            return None
 
-        sorted_seats = sorted(seats, key=sort_key, reverse=True)
-        if sorted_seats:
-            return sorted_seats[0]
+        if len(candidate_seats) == 1:
+            return candidate_seats[0]
 
-        return None
+        return min(candidate_seats, key=lambda seat: BEST_MODE_RANK[seat['type']])
 
     @classmethod
-    def chunks(cls, keys, chunk_size=50):
+    def chunk_size(cls):
         """
-        Yield chunks of size `chunk_size`.
+        Return the maximum number of courseruns requested from discovery in a single api call.
         """
-        for i in range(0, len(keys), chunk_size):
-            yield keys[i:i + chunk_size]
+        return getattr(settings, 'FEDERATED_CONTENT_CONNECTOR_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
 
-    @staticmethod
-    def construct_course_key(course_locator):
+    @classmethod
+    def courserun_locators_chunks(cls, courserun_locators):
         """
-        Construct course key from course run key.
+        Yield chunks of courserun locators that can be fetched from discovery in a single api call.
+
+        A chunk holds at most `chunk_size()` locators and is cut short when its url encoded courserun keys
+        would exceed `MAX_QUERY_PARAM_LENGTH` characters. Course keys sent to discovery are never longer
+        than their courserun keys, but a courserun fetched through the uuid fallback is sent as a course uuid
+        which can be longer than a short courserun key, so each locator counts at least `COURSE_UUID_LENGTH`.
         """
-        return f'{course_locator.org}+{course_locator.course}'
+        chunk_size = cls.chunk_size()
+        chunk, chunk_length = [], 0
+        for courserun_locator in courserun_locators:
+            length = max(len(quote_key(str(courserun_locator))), COURSE_UUID_LENGTH) + 1
+            if chunk and (len(chunk) >= chunk_size or chunk_length + length > MAX_QUERY_PARAM_LENGTH):
+                yield chunk
+                chunk, chunk_length = [], 0
+
+            chunk.append(courserun_locator)
+            chunk_length += length
+
+        if chunk:
+            yield chunk
 
     @classmethod
-    def find_attr(cls, iterable, attr_name, attr_value):
+    def chunks(cls, keys, chunk_size=50):
         """
-        Find value of an attribute from with in an iterable.
+        Yield chunks of size `chunk_size` from any iterable.
         """
-        for item in iterable:
-            if item[attr_name] == attr_value:
-                return item
+        iterator = iter(keys)
+        while True:
+            chunk = list(islice(iterator, chunk_size))
+            if not chunk:
+                return
+            yield chunk
 
-        return None
+    @staticmethod
+    def construct_course_key(course_locator):
+        """
+        Construct course key from course run key.
+        """
+        return f'{course_locator.org}+{course_locator.course}'
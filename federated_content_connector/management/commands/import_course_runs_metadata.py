@@ -10,5 +10,13 @@ class Command(BaseCommand):
 
     help = "Import course metadata for all existing courses"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--use-cache',
+            action='store_true',
+            help='Reuse discovery api responses cached by an import in the last '
+                 'FEDERATED_CONTENT_CONNECTOR_API_CACHE_TIMEOUT seconds',
+        )
+
     def handle(self, *args, **options):
-        CourseMetadataImporter.import_all_courses_metadata()
+        CourseMetadataImporter.import_all_courses_metadata(use_cache=options['use_cache'])
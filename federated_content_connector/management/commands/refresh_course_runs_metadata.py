@@ -34,27 +34,29 @@ class Command(BaseCommand):
             last_successful_import_timestamp = timestamp.strftime(timestamp_format)
             CourseDetailsImportStatus.save_last_successful_import_timestamp(last_successful_import_timestamp)
 
-        logger.info(f'[REFRESH_COURSE_METADATA] Refresh Started. Timestamp: [{last_successful_import_timestamp}]')
+        logger.info('[REFRESH_COURSE_METADATA] Refresh Started. Timestamp: [%s]', last_successful_import_timestamp)
 
         for courses in CourseMetadataImporter.courses(last_successful_import_timestamp):
             course_data_modified_timestamps.extend([course['data_modified_timestamp'] for course in courses])
 
-            courserun_with_course_uuids = cls.courseruns_to_update(courses)
-            courserun_keys = courserun_with_course_uuids.keys()
+            courserun_with_course_keys = cls.courseruns_to_update(courses)
+            courserun_keys = courserun_with_course_keys.keys()
 
-            logger.info(f'[REFRESH_COURSE_METADATA] Processing. Courseruns: [{courserun_keys}]')
+            logger.info('[REFRESH_COURSE_METADATA] Processing. Courseruns count: [%s]', len(courserun_keys))
+            logger.debug('[REFRESH_COURSE_METADATA] Processing. Courseruns: [%s]', courserun_keys)
 
             processed_courses_details = CourseMetadataImporter.process_courses_details(
                 courses,
-                courserun_with_course_uuids
+                courserun_with_course_keys
             )
             CourseMetadataImporter.store_courses_details(processed_courses_details)
 
-            logger.info(f'[REFRESH_COURSE_METADATA] Processing Completed. Courseruns: [{courserun_keys}]')
+            logger.info('[REFRESH_COURSE_METADATA] Processing Completed. Courseruns count: [%s]', len(courserun_keys))
+            logger.debug('[REFRESH_COURSE_METADATA] Processing Completed. Courseruns: [%s]', courserun_keys)
 
         # Sort course timestamps in descending order and store first timestamp as last_successful_import_timestamp
         if course_data_modified_timestamps:
-            logger.info(f'[REFRESH_COURSE_METADATA] All Course Timestamps: [{course_data_modified_timestamps}]')
+            logger.debug('[REFRESH_COURSE_METADATA] All Course Timestamps: [%s]', course_data_modified_timestamps)
             sorted_timestamps = sorted(
                 course_data_modified_timestamps,
                 key=lambda timestamp: datetime.strptime(timestamp, timestamp_format),
@@ -63,16 +65,16 @@ class Command(BaseCommand):
             next_timestamp = sorted_timestamps[0]
             CourseDetailsImportStatus.save_last_successful_import_timestamp(next_timestamp)
 
-            logger.info(f'[REFRESH_COURSE_METADATA] Next Timestamp: [{next_timestamp}]')
+            logger.info('[REFRESH_COURSE_METADATA] Next Timestamp: [%s]', next_timestamp)
 
         logger.info('[REFRESH_COURSE_METADATA] Refresh Completed.')
 
     @classmethod
     def courseruns_to_update(cls, courses):
-        """Return a map of courserun key and course uuid."""
-        courserun_with_course_uuids = {}
+        """Return a map of courserun key and course key."""
+        courserun_with_course_keys = {}
         for course in courses:
             for courserun in course.get('course_runs', []):
-                courserun_with_course_uuids[courserun.get('key')] = courserun.get('course_uuid')
+                courserun_with_course_keys[courserun.get('key')] = course.get('key')
 
-        return courserun_with_course_uuids
+        return courserun_with_course_keys
@@ -1,20 +1,46 @@
 """
 Tests for `import_course_runs_metadata` management command.
 """
+import copy
 import datetime
+import json
+import time
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
+import ddt
 import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.core.management import call_command
+from django.test import override_settings
 from opaque_keys.edx.keys import CourseKey
+from openedx.core.djangoapps.catalog.models import CatalogIntegration
+from requests import Response
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.exceptions import HTTPError
 
 from federated_content_connector.management.commands import import_course_runs_metadata
 from federated_content_connector.management.commands.import_course_runs_metadata import CourseMetadataImporter
-from federated_content_connector.management.commands.tests.test_utils import side_effect_func
+from federated_content_connector.management.commands.tests.test_utils import (
+    COURSE_RUNS_URL,
+    COURSES_ENDPOINT_RESPONSE,
+    COURSES_URL,
+    RESPONSE_TYPE_EMPTY,
+    MockResponse,
+    side_effect_func,
+)
 from federated_content_connector.models import CourseDetails
 
 
+def json_response(data):
+    """
+    Return a mocked api response with `data` as json body.
+    """
+    return MagicMock(content=json.dumps(data).encode(), **{'json.return_value': data})
+
+
+@ddt.ddt
 @pytest.mark.django_db
 class TestImportCourserunsMetadataCommand(TestCase):
     """
@@ -24,6 +50,8 @@ class TestImportCourserunsMetadataCommand(TestCase):
     def setUp(self):
         super().setUp()
         self.command = import_course_runs_metadata.Command()
+        self.service_user = get_user_model().objects.create(username=CatalogIntegration.current().service_username)
+        cache.clear()
 
     def courserun_locators(self):
         """
@@ -64,3 +92,359 @@ class TestImportCourserunsMetadataCommand(TestCase):
         assert course_details.start_date.replace(tzinfo=None) == datetime.datetime(2022, 9, 11, 12, 1, 8)
         assert course_details.end_date is None
         assert course_details.enroll_by is None
+
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    @patch.object(CourseMetadataImporter, 'courserun_locators_to_import')
+    def test_command_updates_existing_records(self, mocked_courserun_locators_to_import, mocked_get_api_client):
+        """
+        Verify that command updates already imported records and creates the missing ones.
+        """
+        existing_course_details = CourseDetails.objects.create(
+            id=self.courserun_locators()[0],
+            course_type='verified-audit',
+            product_source='edx',
+        )
+
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(side_effect=side_effect_func)
+        mocked_courserun_locators_to_import.return_value = self.courserun_locators()
+
+        call_command(self.command)
+
+        assert CourseDetails.objects.count() == 2
+
+        course_details = CourseDetails.objects.get(id=self.courserun_locators()[0])
+        assert course_details.course_type == 'executive-education-2u'
+        assert course_details.product_source == '2u'
+        assert course_details.enroll_by.replace(tzinfo=None) == datetime.datetime(2023, 6, 13, 23, 59, 59)
+        assert course_details.created == existing_course_details.created
+        assert course_details.modified > existing_course_details.modified
+
+    def test_api_clients_share_connection_pool(self):
+        """
+        Verify that all discovery api clients use the same http adapter.
+        """
+
+        api_url = '/api/v1/courses/'
+        first_client = CourseMetadataImporter.get_api_client()
+        second_client = CourseMetadataImporter.get_api_client()
+
+        assert first_client is not second_client
+        assert first_client.get_adapter(api_url) is CourseMetadataImporter.get_http_adapter()
+        assert second_client.get_adapter(api_url) is CourseMetadataImporter.get_http_adapter()
+
+    @ddt.data(
+        ([], None),
+        (None, None),
+        ([{'type': 'honor'}], None),
+        ([{'type': 'honor'}, {'type': 'audit'}], {'type': 'audit'}),
+        ([{'type': 'audit'}, {'type': 'verified'}, {'type': 'honor'}], {'type': 'verified'}),
+        ([{'type': 'honor'}, {'type': 'unpaid-executive-education'}], {'type': 'unpaid-executive-education'}),
+    )
+    @ddt.unpack
+    def test_find_best_mode_seat(self, seats, expected_seat):
+        """
+        Verify that `find_best_mode_seat` returns the seat with the best course mode.
+        """
+        assert CourseMetadataImporter.find_best_mode_seat(seats) == expected_seat
+
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    @patch.object(CourseMetadataImporter, 'courserun_locators_to_import')
+    def test_command_with_use_cache(self, mocked_courserun_locators_to_import, mocked_get_api_client):
+        """
+        Verify that a full import reuses cached discovery responses only when asked to.
+        """
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(side_effect=side_effect_func)
+        mocked_courserun_locators_to_import.side_effect = self.courserun_locators
+
+        call_command(self.command, '--use-cache')
+        assert mocked_get_api_client.return_value.get.call_count == 1
+
+        call_command(self.command, '--use-cache')
+        assert mocked_get_api_client.return_value.get.call_count == 1
+
+        call_command(self.command)
+        assert mocked_get_api_client.return_value.get.call_count == 2
+
+        CourseMetadataImporter.import_specific_courses_metadata(self.courserun_locators())
+        assert mocked_get_api_client.return_value.get.call_count == 3
+        assert CourseDetails.objects.count() == 2
+
+    @override_settings(FEDERATED_CONTENT_CONNECTOR_API_CACHE_MAX_SIZE=100)
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    @patch.object(CourseMetadataImporter, 'courserun_locators_to_import')
+    def test_command_with_use_cache_skips_large_responses(
+        self, mocked_courserun_locators_to_import, mocked_get_api_client
+    ):
+        """
+        Verify that discovery responses larger than the cache max size are not cached.
+        """
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(side_effect=side_effect_func)
+        mocked_courserun_locators_to_import.side_effect = self.courserun_locators
+
+        call_command(self.command, '--use-cache')
+        call_command(self.command, '--use-cache')
+
+        assert mocked_get_api_client.return_value.get.call_count == 2
+        assert CourseDetails.objects.count() == 2
+
+    def test_chunks(self):
+        """
+        Verify that `chunks` splits any iterable into lists of `chunk_size` items.
+        """
+        assert not list(CourseMetadataImporter.chunks(iter([]), chunk_size=2))
+        assert list(CourseMetadataImporter.chunks(iter(range(5)), chunk_size=2)) == [[0, 1], [2, 3], [4]]
+
+    @override_settings(FEDERATED_CONTENT_CONNECTOR_CHUNK_SIZE=1)
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    @patch.object(CourseMetadataImporter, 'courserun_locators_to_import')
+    def test_command_with_chunk_size(self, mocked_courserun_locators_to_import, mocked_get_api_client):
+        """
+        Verify that command fetches courseruns from discovery in chunks of configured size.
+        """
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(side_effect=side_effect_func)
+        mocked_courserun_locators_to_import.return_value = self.courserun_locators()
+
+        call_command(self.command)
+
+        assert mocked_get_api_client.return_value.get.call_count == 2
+        for api_call in mocked_get_api_client.return_value.get.call_args_list:
+            assert 'limit=1&' in api_call.args[0]
+            assert '&fields=' in api_call.args[0]
+        assert CourseDetails.objects.count() == 2
+
+    @patch('federated_content_connector.course_metadata_importer.MAX_QUERY_PARAM_LENGTH', 80)
+    def test_courserun_locators_chunks_url_length(self):
+        """
+        Verify that chunks are cut short when url encoded courserun keys get too long.
+        """
+        courserun_locators = self.courserun_locators() * 2
+        chunks = list(CourseMetadataImporter.courserun_locators_chunks(courserun_locators))
+        assert chunks == [courserun_locators[:2], courserun_locators[2:]]
+
+    @patch('federated_content_connector.course_metadata_importer.MAX_QUERY_PARAM_LENGTH', 80)
+    def test_courserun_locators_chunks_uuid_length(self):
+        """
+        Verify that short courserun keys are counted as long as the course uuids sent by the uuid fallback.
+        """
+        courserun_locators = [CourseKey.from_string(f'course-v1:a+b+{run}') for run in 'cde']
+        chunks = list(CourseMetadataImporter.courserun_locators_chunks(courserun_locators))
+        assert chunks == [courserun_locators[:2], courserun_locators[2:]]
+
+    @ddt.data(
+        (400, 1),
+        (404, 1),
+        (429, 3),
+        (500, 3),
+        (503, 3),
+    )
+    @ddt.unpack
+    @patch('time.sleep')
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    def test_get_response_from_api_retries(self, status_code, expected_calls, mocked_get_api_client, __):
+        """
+        Verify that api calls are retried only for transient errors.
+        """
+        response = Response()
+        response.status_code = status_code
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(return_value=response)
+
+        with pytest.raises(HTTPError):
+            CourseMetadataImporter.get_response_from_api('/api/v1/courses/')
+
+        assert mocked_get_api_client.return_value.get.call_count == expected_calls
+
+    @patch('time.sleep')
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    def test_get_response_from_api_retries_connection_errors(self, mocked_get_api_client, __):
+        """
+        Verify that api calls are retried on connection errors.
+        """
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(side_effect=RequestsConnectionError)
+
+        with pytest.raises(RequestsConnectionError):
+            CourseMetadataImporter.get_response_from_api('/api/v1/courses/')
+
+        assert mocked_get_api_client.return_value.get.call_count == 3
+
+    def test_response_json(self):
+        """
+        Verify that `response_json` decodes the api response body.
+        """
+        response = side_effect_func(COURSES_URL)
+        assert CourseMetadataImporter.response_json(response) == COURSES_ENDPOINT_RESPONSE
+
+    @patch('federated_content_connector.course_metadata_importer.STORE_BATCH_SIZE', 1)
+    def test_store_courses_details_in_batches(self):
+        """
+        Verify that `store_courses_details` stores every record when they span multiple batches.
+        """
+        courserun_keys = list(map(str, self.courserun_locators()))
+        CourseDetails.objects.create(id=courserun_keys[0], course_type='audit', product_source='edx')
+
+        courses_details = (
+            (courserun_key, {'course_type': 'verified-audit', 'product_source': 'edx'})
+            for courserun_key in courserun_keys
+        )
+        CourseMetadataImporter.store_courses_details(courses_details)
+
+        assert CourseDetails.objects.count() == 2
+        assert CourseDetails.objects.filter(course_type='verified-audit').count() == 2
+
+    def test_store_courses_details_created_concurrently(self):
+        """
+        Verify that `store_courses_details` updates a record created after the existing records are looked up.
+        """
+        courserun_keys = list(map(str, self.courserun_locators()))
+
+        def create_after_lookup(*args, **kwargs):
+            # another import creates the record once the lookup has found no existing records
+            CourseDetails.objects.create(id=courserun_keys[0], course_type='audit', product_source='edx')
+            return CourseDetails.objects.none()
+
+        courses_details = (
+            (courserun_key, {'course_type': 'verified-audit', 'product_source': 'edx'})
+            for courserun_key in courserun_keys
+        )
+        with patch.object(CourseDetails.objects, 'filter', side_effect=create_after_lookup):
+            CourseMetadataImporter.store_courses_details(courses_details)
+
+        assert CourseDetails.objects.count() == 2
+        assert CourseDetails.objects.filter(course_type='verified-audit').count() == 2
+
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    def test_fetch_courses_details_by_course_keys(self, mocked_get_api_client):
+        """
+        Verify that courses are requested from discovery by the course keys of the courseruns.
+        """
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(side_effect=side_effect_func)
+        courserun_locators = self.courserun_locators() + [CourseKey.from_string('course-v1:edX+DemoX+2T2023')]
+
+        __, courserun_with_course_keys = CourseMetadataImporter.fetch_courses_details(courserun_locators, '/api/v1')
+
+        # `course-v1:edX+DemoX+2T2023` is not a courserun of `edX+DemoX` in discovery
+        assert courserun_with_course_keys == {
+            'course-v1:edX+DemoX+Demo_Course': 'edX+DemoX',
+            'course-v1:edX+E2E-101+course': 'edX+E2E-101',
+        }
+        api_url = mocked_get_api_client.return_value.get.call_args_list[0].args[0]
+        assert api_url.startswith(COURSES_URL)
+        assert api_url.endswith('&keys=edX%2BDemoX,edX%2BE2E-101')
+
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    def test_fetch_courses_details_falls_back_to_course_uuids(self, mocked_get_api_client):
+        """
+        Verify that courses not found by course key are fetched by the course uuid of their courseruns.
+        """
+        def side_effect(url):
+            if url.startswith(COURSES_URL) and '&keys=' in url:
+                return MockResponse(response_type=RESPONSE_TYPE_EMPTY)
+            return side_effect_func(url)
+
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(side_effect=side_effect)
+
+        results, courserun_with_course_keys = CourseMetadataImporter.fetch_courses_details(
+            self.courserun_locators(), '/api/v1'
+        )
+
+        assert results == COURSES_ENDPOINT_RESPONSE['results']
+        assert courserun_with_course_keys == {
+            'course-v1:edX+DemoX+Demo_Course': 'edX+DemoX',
+            'course-v1:edX+E2E-101+course': 'edX+E2E-101',
+        }
+        api_urls = [api_call.args[0] for api_call in mocked_get_api_client.return_value.get.call_args_list]
+        assert len(api_urls) == 3
+        assert api_urls[1].startswith(COURSE_RUNS_URL)
+        assert '&uuids=' in api_urls[2]
+
+    @override_settings(FEDERATED_CONTENT_CONNECTOR_CHUNK_SIZE=1, FEDERATED_CONTENT_CONNECTOR_MAX_WORKERS=2)
+    @patch('federated_content_connector.course_metadata_importer.connections')
+    @patch.object(CourseMetadataImporter, 'store_courses_details')
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    def test_import_courses_metadata_concurrently(
+        self, mocked_get_api_client, mocked_store_courses_details, mocked_connections
+    ):
+        """
+        Verify that chunks fetched concurrently are stored in chunk order, using the service user and api base url
+        resolved once, and that worker threads close their database connections.
+        """
+        def slow_first_chunk_side_effect(url):
+            # let the first chunk of each batch finish after the second one
+            if 'DemoX' in url:
+                time.sleep(0.05)
+            return side_effect_func(url)
+
+        stored_courserun_keys = []
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(side_effect=slow_first_chunk_side_effect)
+        mocked_store_courses_details.side_effect = lambda courses_details: stored_courserun_keys.append(
+            [courserun_key for courserun_key, __ in courses_details]
+        )
+        courserun_locators = self.courserun_locators() + [CourseKey.from_string('course-v1:edX+E2E-101+course2')]
+
+        CourseMetadataImporter.import_courses_metadata(courserun_locators)
+
+        assert stored_courserun_keys == [
+            ['course-v1:edX+DemoX+Demo_Course'],
+            ['course-v1:edX+E2E-101+course'],
+            [],
+        ]
+        for api_client_call in mocked_get_api_client.call_args_list:
+            assert api_client_call.args == (self.service_user, '/api/v1')
+        assert mocked_connections.close_all.call_count == 3
+
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    def test_fetch_courses_details_follows_pagination(self, mocked_get_api_client):
+        """
+        Verify that courses on all pages of the discovery response are fetched.
+        """
+        next_url = '/api/v1/courses/?page=2'
+        first_page, second_page = (
+            {'next': next_url, 'results': COURSES_ENDPOINT_RESPONSE['results'][:1]},
+            {'next': None, 'results': COURSES_ENDPOINT_RESPONSE['results'][1:]},
+        )
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(
+            side_effect=lambda url: json_response(second_page if url == next_url else first_page)
+        )
+
+        results, __ = CourseMetadataImporter.fetch_courses_details(self.courserun_locators(), '/api/v1')
+
+        assert results == COURSES_ENDPOINT_RESPONSE['results']
+        assert mocked_get_api_client.return_value.get.call_count == 2
+        assert mocked_get_api_client.return_value.get.call_args.args[0] == next_url
+
+    @patch.object(CourseMetadataImporter, 'get_api_client')
+    def test_import_courserun_of_course_with_different_key(self, mocked_get_api_client):
+        """
+        Verify that a courserun is imported from its own course when the course key derived from the courserun key
+        belongs to a course that does not contain the courserun.
+        """
+        exec_ed_course, verified_course = COURSES_ENDPOINT_RESPONSE['results']
+        other_course = dict(copy.deepcopy(verified_course), key='edX+DemoX', uuid='other-course-uuid', course_runs=[])
+        renamed_course = dict(copy.deepcopy(exec_ed_course), key='edX+SupplyChain')
+
+        def side_effect(url):
+            if url.startswith(COURSES_URL) and '&keys=' in url:
+                return json_response({'next': None, 'results': [other_course, verified_course]})
+            if url.startswith(COURSES_URL) and '&uuids=' in url:
+                return json_response({'next': None, 'results': [renamed_course]})
+            return side_effect_func(url)
+
+        mocked_get_api_client.return_value = MagicMock()
+        mocked_get_api_client.return_value.get = MagicMock(side_effect=side_effect)
+
+        CourseMetadataImporter.import_courses_metadata(self.courserun_locators())
+
+        assert CourseDetails.objects.count() == 2
+        course_details = CourseDetails.objects.get(id=self.courserun_locators()[0])
+        assert course_details.course_type == 'executive-education-2u'
+        assert course_details.product_source == '2u'
+        assert course_details.enroll_by.replace(tzinfo=None) == datetime.datetime(2023, 6, 13, 23, 59, 59)
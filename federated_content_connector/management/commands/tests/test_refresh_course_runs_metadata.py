@@ -2,6 +2,7 @@
 Tests for `refresh_course_runs_metadata` management command.
 """
 import datetime
+import json
 from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
@@ -26,6 +27,10 @@ class MockResponse:
     def raise_for_status(self):
         return True
 
+    @property
+    def content(self):
+        return json.dumps(self.json()).encode()
+
     def json(self):
         """
         Return mocked json response.
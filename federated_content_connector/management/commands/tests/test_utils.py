@@ -1,10 +1,12 @@
 """Mocked API Responses."""
+import json
 
 COURSE_RUNS_URL = '/api/v1/course_runs/'
 COURSES_URL = '/api/v1/courses/'
 
 RESPONSE_TYPE_COURSERUNS = 'courseruns'
 RESPONSE_TYPE_COURSES = 'courses'
+RESPONSE_TYPE_EMPTY = 'empty'
 
 
 COURSES_ENDPOINT_RESPONSE = {
@@ -997,9 +999,18 @@ COURSE_RUNS_ENDPOINT_RESPONSE = {
 }
 
 
+EMPTY_RESPONSE = {
+    "count": 0,
+    "next": None,
+    "previous": None,
+    "results": []
+}
+
+
 RESPONSES = {
     RESPONSE_TYPE_COURSES: COURSES_ENDPOINT_RESPONSE,
     RESPONSE_TYPE_COURSERUNS: COURSE_RUNS_ENDPOINT_RESPONSE,
+    RESPONSE_TYPE_EMPTY: EMPTY_RESPONSE,
 }
 
 
@@ -1014,6 +1025,10 @@ class MockResponse:
     def raise_for_status(self):
         return True
 
+    @property
+    def content(self):
+        return json.dumps(self.json()).encode()
+
     def json(self):
         return RESPONSES[self.response_type]
 
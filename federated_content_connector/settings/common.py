@@ -2,6 +2,20 @@
 federated_content_connector common settings.
 """
 
+from federated_content_connector.constants import (
+    DEFAULT_API_CACHE_MAX_SIZE,
+    DEFAULT_API_CACHE_TIMEOUT,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_MAX_WORKERS,
+)
 
-def plugin_settings(settings):  # pylint: disable=unused-argument
-    pass
+
+def plugin_settings(settings):
+    """
+    Add federated_content_connector default settings.
+    """
+    settings.FEDERATED_CONTENT_CONNECTOR_CHUNK_SIZE = DEFAULT_CHUNK_SIZE
+    settings.FEDERATED_CONTENT_CONNECTOR_MAX_WORKERS = DEFAULT_MAX_WORKERS
+    settings.FEDERATED_CONTENT_CONNECTOR_API_CACHE_TIMEOUT = DEFAULT_API_CACHE_TIMEOUT
+    # cache backends such as memcached do not store items over 1 MB, larger discovery responses are not cached
+    settings.FEDERATED_CONTENT_CONNECTOR_API_CACHE_MAX_SIZE = DEFAULT_API_CACHE_MAX_SIZE
@@ -10,7 +10,8 @@ LOGGER = getLogger(__name__)
 def handle_courseoverview_import_course_details(sender, courserun_key, **kwargs):  # pylint: disable=unused-argument
     """Handle CourseOverview.import_course_metadata signal."""
     LOGGER.info(
-        f"[FEDERATED_CONTENT_CONNECTOR] CourseOverview.import_course_metadata signal received. Key: [{courserun_key}]"
+        "[FEDERATED_CONTENT_CONNECTOR] CourseOverview.import_course_metadata signal received. Key: [%s]",
+        courserun_key,
     )
 
     courserun_keys = [courserun_key]
@@ -20,6 +21,7 @@ def handle_courseoverview_import_course_details(sender, courserun_key, **kwargs)
 def handle_courseoverview_delete_course_details(sender, courserun_key, **kwargs):  # pylint: disable=unused-argument
     """Handle CourseOverview.delete_course_metadata signal."""
     LOGGER.info(
-        f"[FEDERATED_CONTENT_CONNECTOR] CourseOverview.delete_course_metadata signal received. Key: [{courserun_key}]"
+        "[FEDERATED_CONTENT_CONNECTOR] CourseOverview.delete_course_metadata signal received. Key: [%s]",
+        courserun_key,
     )
     CourseDetails.objects.filter(id=courserun_key).delete()
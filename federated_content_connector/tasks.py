@@ -17,6 +17,6 @@ def import_course_metadata(courserun_keys):
     Arguments:
         courserun_keys (list): courserun keys
     """
-    LOGGER.info(f'[FEDERATED_CONTENT_CONNECTOR] import_course_metadata task triggered: Keys: {courserun_keys}')
+    LOGGER.info('[FEDERATED_CONTENT_CONNECTOR] import_course_metadata task triggered: Keys: %s', courserun_keys)
     courserun_locators = [CourseKey.from_string(courserun_key) for courserun_key in courserun_keys]
     CourseMetadataImporter.import_specific_courses_metadata(courserun_locators)
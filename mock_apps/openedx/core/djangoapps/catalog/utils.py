@@ -1,3 +1,6 @@
+import requests
+
+
 def get_course_data(course_key_str, course_data):
     return {course_key_str: 'course_data', 'course_type': 'course_type', 'product_source': 'product_source'}
 
@@ -7,4 +10,4 @@ def get_catalog_api_base_url(*args, **kwargs):
 
 
 def get_catalog_api_client(*args, **kwargs):
-    pass
+    return requests.Session()
@@ -6,7 +6,10 @@ from unittest import TestCase
 from unittest.mock import MagicMock, patch
 
 import pytest
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from opaque_keys.edx.keys import CourseKey
+from openedx.core.djangoapps.catalog.models import CatalogIntegration
 
 from federated_content_connector.management.commands.import_course_runs_metadata import CourseMetadataImporter
 from federated_content_connector.management.commands.tests.test_utils import side_effect_func
@@ -25,6 +28,8 @@ class TestSignals(TestCase):
 
     def setUp(self):
         super().setUp()
+        get_user_model().objects.create(username=CatalogIntegration.current().service_username)
+        cache.clear()
 
         self.courserun_locators = [
             CourseKey.from_string("course-v1:edX+DemoX+Demo_Course"),